@@ -1,26 +1,32 @@
+import re
+from array import array
+
 # Define opcodes for different types of instructions
-opcodes = {
-    "add": "000000", "sub": "000000", "and": "000000", "or": "000000",
-    "xor": "000000", "nor": "000000", "slt": "000000", "sltu": "000000",
-    "sll": "000000", "srl": "000000", "sra": "000000", "sllv": "000000",
-    "srlv": "000000", "srav": "000000", "jr": "000000", "addu": "000000",
-    "subu": "000000", "slti": "001010", "sltiu": "001011", "addi": "001000",
-    "addiu": "001001", "andi": "001100", "ori": "001101", "xori": "001110",
-    "lw": "100011", "sw": "101011", "beq": "000100", "bne": "000101",
-    "j": "000010", "jal": "000011"
+OPCODES = {
+    "add": 0x00, "sub": 0x00, "and": 0x00, "or": 0x00,
+    "xor": 0x00, "nor": 0x00, "slt": 0x00, "sltu": 0x00,
+    "sll": 0x00, "srl": 0x00, "sra": 0x00, "sllv": 0x00,
+    "srlv": 0x00, "srav": 0x00, "jr": 0x00, "addu": 0x00,
+    "subu": 0x00, "slti": 0x0A, "sltiu": 0x0B, "addi": 0x08,
+    "addiu": 0x09, "andi": 0x0C, "ori": 0x0D, "xori": 0x0E,
+    "lw": 0x23, "sw": 0x2B, "beq": 0x04, "bne": 0x05,
+    "j": 0x02, "jal": 0x03
 }
 
 # Define function codes for R-type instructions
-func_codes = {
-    "add": "100000", "sub": "100010", "and": "100100", "or": "100101",
-    "xor": "100110", "nor": "100111", "slt": "101010", "sltu": "101011",
-    "sll": "000000", "srl": "000010", "sra": "000011", "sllv": "000100",
-    "srlv": "000110", "srav": "000111", "jr": "001000", "addu": "100001",
-    "subu": "100011"
+FUNCS = {
+    "add": 0x20, "sub": 0x22, "and": 0x24, "or": 0x25,
+    "xor": 0x26, "nor": 0x27, "slt": 0x2A, "sltu": 0x2B,
+    "sll": 0x00, "srl": 0x02, "sra": 0x03, "sllv": 0x04,
+    "srlv": 0x06, "srav": 0x07, "jr": 0x08, "addu": 0x21,
+    "subu": 0x23
 }
 
 # Register mapping
-registers = {f"${i}": f"{i:05b}" for i in range(32)}
+REGS = {f"${i}": i for i in range(32)}
+
+# Memory operand "offset(base)" with a decimal or unsigned hex offset, e.g. -8($29) or 0x10($4)
+MEM_OPERAND = re.compile(r'(0[xX][0-9A-Fa-f]+|[-+]?\d+)\((\$\d+)\)')
 def parse_immediate(value):
     # Check for hexadecimal and parse accordingly
     if value.lower().startswith("0x"):
@@ -30,142 +36,190 @@ def parse_immediate(value):
 def parse_instruction(line):
     parts = line.replace(',', ' ').split()
     opcode = parts[0].lower()
-    operands = parts[1:]
+    operands = tuple(parts[1:])  # immutable, so the GC can stop tracking parsed records
     return opcode, operands
 
-# Assembling functions for R-type
-def assemble_r_type(opcode, operands):
-    if opcode in ["sll", "srl", "sra", "sllv", "srlv", "srav"]:
-        rd = registers[operands[0]]
-        rs = "00000"
-        rt = registers[operands[1]]
-        shamt = format(int(operands[2]), '05b')
-    elif opcode == "jr":
-        rs = registers[operands[0]]
-        rt = "00000"
-        rd = "00000"
-        shamt = "00000"
-    else:
-        rd = registers[operands[0]]
-        rs = registers[operands[1]]
-        rt = registers[operands[2]]
-        shamt = "00000"
-    func = func_codes[opcode]
-    return f"{opcodes[opcode]}_{rs}_{rt}_{rd}_{shamt}_{func}"
-
-# Assembling functions for I-type (handling immediate values and branch offsets)
-def assemble_i_type(opcode, operands, label_map=None, current_address=None):
-    if '(' in operands[1] and ')' in operands[1]:
-        offset, base = operands[1].replace(')', '').split('(')
-        immediate = format(parse_immediate(offset) & 0xFFFF, '016b')
-        rt = registers[operands[0]]
-        rs = registers[base]
-    elif opcode in ['beq', 'bne'] and label_map and current_address is not None:
-        rs = registers[operands[0]]
-        rt = registers[operands[1]]
-        label_address = label_map[operands[2]]
-        offset = label_address - current_address
-        immediate = format(offset & 0xFFFF, '016b')
-    else:
-        rt = registers[operands[0]]
-        rs = registers[operands[1]]
-        immediate = format(parse_immediate(operands[2]) & 0xFFFF, '016b')
-    return f"{opcodes[opcode]}_{rs}_{rt}_{immediate}"
+# Handlers for the dispatch table, one per instruction shape; each returns the list of encoded words
+# R-type: opcode field is 0, so only the register fields and funct are set
+def _r_alu(opcode, operands, label_map, current_address):
+    return [(REGS[operands[1]] << 21) | (REGS[operands[2]] << 16) | (REGS[operands[0]] << 11) | FUNCS[opcode]]
+
+def _r_shift(opcode, operands, label_map, current_address):
+    return [(REGS[operands[1]] << 16) | (REGS[operands[0]] << 11) | ((int(operands[2]) & 0x1F) << 6) | FUNCS[opcode]]
+
+def _r_jr(opcode, operands, label_map, current_address):
+    return [(REGS[operands[0]] << 21) | FUNCS[opcode]]
 
-# Assembling functions for J-type (handling jump addresses)
-def assemble_j_type(opcode, operands, label_map=None):
+# I-type: rt, rs, immediate
+def _i_imm(opcode, operands, label_map, current_address):
+    return [(OPCODES[opcode] << 26) | (REGS[operands[1]] << 21) | (REGS[operands[0]] << 16)
+            | (parse_immediate(operands[2]) & 0xFFFF)]
+
+# I-type memory access: rt, offset(base)
+def _i_memory(opcode, operands, label_map, current_address):
+    m = MEM_OPERAND.fullmatch(operands[1])
+    if m is None:
+        raise ValueError(f"Invalid memory operand: {operands[1]}")
+    offset, base = m.groups()
+    return [(OPCODES[opcode] << 26) | (REGS[base] << 21) | (REGS[operands[0]] << 16)
+            | (parse_immediate(offset) & 0xFFFF)]
+
+# Address of a label, or a ValueError naming it when it is never defined
+def _label_address(label_map, label):
+    if label not in label_map:
+        raise ValueError(f"unknown label '{label}'")
+    return label_map[label]
+
+# I-type branch: rs, rt, label (offset relative to the current address)
+def _i_branch(opcode, operands, label_map, current_address):
+    return [(OPCODES[opcode] << 26) | (REGS[operands[0]] << 21) | (REGS[operands[1]] << 16)
+            | ((_label_address(label_map, operands[2]) - current_address) & 0xFFFF)]
+
+# J-type (handling jump addresses)
+def _j(opcode, operands, label_map, current_address):
     if label_map:
-        address = label_map[operands[0]]
-        address = format(address, '026b')
+        address = _label_address(label_map, operands[0])
     else:
-        address = format(int(operands[0]), '026b')
-    return f"{opcodes[opcode]}_{address}"
-
-# Main function for assembling instructions
-def assemble_instruction(opcode, operands, label_map=None, current_address=None):
-    if opcode == 'nop':
-        return f'00000000000000000000000000000000'
-    elif opcode == "sgt":
-        operands = [operands[0], operands[2], operands[1]]
-        opcode = "slt"
-        return assemble_r_type(opcode, operands)
-    elif opcode == "move":
-        operands = [operands[0], operands[1], '$0']
-        opcode = "add"
-        return assemble_r_type(opcode, operands)
-    elif opcode == "li":
-        operands = [operands[0], '$0', operands[1]]
-        opcode = "addi"
-        return assemble_i_type(opcode, operands)
-    temp_reg = "$25"
-    if opcode == "blt":
-        slt_instruction = assemble_r_type("slt", [temp_reg, operands[0], operands[1]])
-        bne_instruction = assemble_i_type("bne", [temp_reg, "$0", operands[2]], label_map, current_address)
-        return f"{slt_instruction}\n{bne_instruction}"
-    elif opcode == "bgt":
-        slt_instruction = assemble_r_type("slt", [temp_reg, operands[1], operands[0]])
-        bne_instruction = assemble_i_type("bne", [temp_reg, "$0", operands[2]], label_map, current_address)
-        return f"{slt_instruction}\n{bne_instruction}"
-    elif opcode == "ble":
-        slt_instruction = assemble_r_type("slt", [temp_reg, operands[1], operands[0]])
-        beq_instruction = assemble_i_type("beq", [temp_reg, "$0", operands[2]], label_map, current_address)
-        return f"{slt_instruction}\n{beq_instruction}"
-    elif opcode == "bge":
-        slt_instruction = assemble_r_type("slt", [temp_reg, operands[0], operands[1]])
-        beq_instruction = assemble_i_type("beq", [temp_reg, "$0", operands[2]], label_map, current_address)
-        return f"{slt_instruction}\n{beq_instruction}"
-    if opcode in func_codes:
-        return assemble_r_type(opcode, operands)
-    elif opcode in ["lw", "sw", "addi", "addiu", "andi", "ori", "xori", "slti", "sltiu", "beq", "bne"]:
-        return assemble_i_type(opcode, operands, label_map, current_address)
-    elif opcode in ["j", "jal"]:
-        return assemble_j_type(opcode, operands, label_map)
-
-# Main function for processing the assembly code
-def main():
-    with open("input.txt", "r") as f:
-        lines = f.readlines()
+        address = int(operands[0])
+    return [(OPCODES[opcode] << 26) | (address & 0x3FFFFFF)]
 
-    label_map = {}
-    pc = 0
+def _nop(opcode, operands, label_map, current_address):
+    return [0]
+
+# Pseudo-instructions
+def _sgt(opcode, operands, label_map, current_address):
+    return _r_alu("slt", [operands[0], operands[2], operands[1]], label_map, current_address)
+
+def _move(opcode, operands, label_map, current_address):
+    return _r_alu("add", [operands[0], operands[1], '$0'], label_map, current_address)
+
+def _li(opcode, operands, label_map, current_address):
+    return _i_imm("addi", [operands[0], '$0', operands[1]], label_map, current_address)
+
+# Compare-and-branch pseudo-instructions expand to slt $25 + beq/bne
+TEMP_REG = "$25"
+
+def _blt(opcode, operands, label_map, current_address):
+    return (_r_alu("slt", [TEMP_REG, operands[0], operands[1]], label_map, current_address)
+            + _i_branch("bne", [TEMP_REG, "$0", operands[2]], label_map, current_address))
+
+def _bgt(opcode, operands, label_map, current_address):
+    return (_r_alu("slt", [TEMP_REG, operands[1], operands[0]], label_map, current_address)
+            + _i_branch("bne", [TEMP_REG, "$0", operands[2]], label_map, current_address))
+
+def _ble(opcode, operands, label_map, current_address):
+    return (_r_alu("slt", [TEMP_REG, operands[1], operands[0]], label_map, current_address)
+            + _i_branch("beq", [TEMP_REG, "$0", operands[2]], label_map, current_address))
 
-    # First pass: Collect labels and their addresses (line numbers)
-    for line in lines:
+def _bge(opcode, operands, label_map, current_address):
+    return (_r_alu("slt", [TEMP_REG, operands[0], operands[1]], label_map, current_address)
+            + _i_branch("beq", [TEMP_REG, "$0", operands[2]], label_map, current_address))
+
+# Dispatch table: opcode -> handler
+HANDLERS = {opcode: _r_alu for opcode in FUNCS}
+HANDLERS.update({opcode: _r_shift for opcode in ["sll", "srl", "sra", "sllv", "srlv", "srav"]})
+HANDLERS.update({opcode: _i_imm for opcode in ["addi", "addiu", "andi", "ori", "xori", "slti", "sltiu"]})
+HANDLERS.update({
+    "jr": _r_jr, "lw": _i_memory, "sw": _i_memory, "beq": _i_branch, "bne": _i_branch,
+    "j": _j, "jal": _j, "nop": _nop,
+    "sgt": _sgt, "move": _move, "li": _li,
+    "blt": _blt, "bgt": _bgt, "ble": _ble, "bge": _bge
+})
+
+# Binary strings of every 5-bit register/shamt field and 6-bit opcode/funct field
+REG_BIN = [f"{i:05b}" for i in range(32)]
+OP_BIN = [f"{i:06b}" for i in range(64)]
+
+# Listing binary of the nop mnemonic, shown without field separators
+NOP_BINARY = "0" * 32
+
+# Render a word as binary with its fields separated by '_' (R: 6-5-5-5-5-6, I: 6-5-5-16, J: 6-26)
+def format_binary(word):
+    opcode = word >> 26
+    if opcode == 0:
+        return "_".join((OP_BIN[0], REG_BIN[(word >> 21) & 0x1F], REG_BIN[(word >> 16) & 0x1F],
+                         REG_BIN[(word >> 11) & 0x1F], REG_BIN[(word >> 6) & 0x1F], OP_BIN[word & 0x3F]))
+    elif opcode in (2, 3):
+        return f"{OP_BIN[opcode]}_{word & 0x3FFFFFF:026b}"
+    return "_".join((OP_BIN[opcode], REG_BIN[(word >> 21) & 0x1F], REG_BIN[(word >> 16) & 0x1F],
+                     format(word & 0xFFFF, '016b')))
+
+# Pseudo-instructions that expand to two words (slt + beq/bne)
+TWO_WORD_PSEUDO = {"blt", "bgt", "ble", "bge"}
+
+# Parse the source once into records:
+#   ("label", name) or ("instr", line_number, text, opcode, operands, size)
+# Blank and comment-only lines are dropped; size is the number of words emitted.
+# Opcodes are lowercased here once and checked against the dispatch table
+def parse_program(lines):
+    records = []
+    for line_number, line in enumerate(lines, start=1):
         line = line.strip()
-        part = line.replace(',', ' ').split()
-         # Skip processing if the line doesn't split into parts (e.g., blank or invalid lines)
-        if part:
-            opcode = part[0].lower()
-        else :
+        if not line or line.startswith('#'):
             continue
-    
         if line.endswith(":"):
-            label_map[line[:-1]] = pc  # Remove ':' and store label
-        elif line and not line.startswith('#'):  # Only increment PC if it's a non-empty instruction and doesnt start with #(comment)
-            if opcode in ["blt" ,"bgt" ,"ble" ,"bge"] :
-                pc +=2
-            else :
-                pc += 1
+            records.append(("label", line[:-1]))  # Remove ':' and store label
+            continue
+        # Ignore comments (anything after a '#')
+        line = line.split('#')[0].strip()
+        opcode, operands = parse_instruction(line)
+        if opcode not in HANDLERS:
+            raise ValueError(f"Line {line_number}: unknown instruction '{opcode}' in: {line}")
+        size = 2 if opcode in TWO_WORD_PSEUDO else 1
+        records.append(("instr", line_number, line, opcode, operands, size))
+    return records
+
+# Format one listing line as written to output.txt and shown by the scheduler
+def format_listing(text, opcode, word):
+    binary = NOP_BINARY if opcode == "nop" else format_binary(word)
+    return "%s --> [ binary: %s, hex: %08X ]" % (text, binary, word)
+
+# Assemble source lines into (listing, words): words is a uint32 array of the
+# encoded program and listing[k] the listing line of words[k]
+def assemble_program(lines):
+    records = parse_program(lines)
+
+    # First pass: Collect labels and their addresses (word numbers)
+    label_map = {}
+    pc = 0
+    for record in records:
+        if record[0] == "label":
+            label_map[record[1]] = pc
+        else:
+            pc += record[5]
 
     # Second pass: Process instructions
-    with open("output.txt", "w") as f:
-        pc = 0
-        for line in lines:
-            line = line.strip()
-            if line.endswith(":") or line.startswith('#'):  # Skip label lines in the second pass
-                continue
-            if line:  # Process only non-empty lines (instructions)
-                # Ignore comments (anything after a '#')
-                line = line.split('#')[0].strip()  # Remove everything after '#' and strip extra spaces
-                if line:  # Skip empty lines after removing comments
-                    opcode, operands = parse_instruction(line)
-                    if opcode in ["blt" ,"bgt" ,"ble" ,"bge"] :
-                        pc +=1
-                    binary_instructions = assemble_instruction(opcode, operands, label_map, pc)
-                    for binary_instruction in binary_instructions.splitlines():
-                        hex_instruction = f"{int(binary_instruction.replace('_', ''), 2):08X}"
-                        f.write(f"{line} --> [ binary: {binary_instruction}, hex: {hex_instruction} ]\n")
-                    pc += 1
-
-
-main()
+    listing = []
+    words = array('I')
+    pc = 0
+    for record in records:
+        if record[0] == "label":
+            continue
+        _, line_number, line, opcode, operands, size = record
+        # Branches in two-word pseudo-instructions are assembled at the address of the second word
+        try:
+            encoded = HANDLERS[opcode](opcode, operands, label_map, pc + size - 1)
+        except ValueError as err:
+            raise ValueError(f"Line {line_number}: {err} in: {line}") from err
+        for word in encoded:
+            listing.append(format_listing(line, opcode, word))
+            words.append(word)
+        pc += size
+    return listing, words
+
+# Write the whole listing at once
+def write_listing(listing, output_file="output.txt"):
+    out_lines = [line + "\n" for line in listing]
+    with open(output_file, "w") as f:
+        f.writelines(out_lines)
+
+# Main function for processing the assembly code (assembly only; scheduler.py
+# assembles and schedules in one run and writes this listing too)
+def main():
+    with open("input.txt", "r") as f:
+        listing, words = assemble_program(f)
+    write_listing(listing)
+
+
+if __name__ == '__main__':
+    main()
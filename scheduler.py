@@ -1,28 +1,60 @@
+import ctypes
+import functools
+import os
+from array import array
+from collections import namedtuple
 
-def is_special(hex_instr):
-    """
-    Determine if the instruction (given as an 8-digit hex string) is 'special'
-    (i.e. must be in slot2). Special opcodes (first 6 bits) include:
-      - j (opcode 2), jal (opcode 3)
-      - beq (opcode 4), bne (opcode 5)
-      - lw (opcode 35), sw (opcode 43)
-    NOP (00000000) is not considered special.
-    """
-    if hex_instr == "00000000":
-        return False
-    instr_int = int(hex_instr, 16)
-    opcode = (instr_int >> 26) & 0x3F
-    return opcode in {2, 3, 4, 5, 35, 43}
+# Optional compiled scheduler built from scheduler_ext.c (see the build line in that file)
+_EXT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                         "scheduler_ext.dll" if os.name == "nt" else "scheduler_ext.so")
+try:
+    _ext = ctypes.CDLL(_EXT_PATH)
+except OSError:  # Not built; fall back to the NumPy/Numba/Python paths
+    _ext = None
+else:
+    _ext.schedule.restype = ctypes.c_long
+    _ext.schedule.argtypes = [ctypes.c_void_p, ctypes.c_long, ctypes.c_long] + [ctypes.c_void_p] * 5
+
+from Assembler import NOP_BINARY, assemble_program, write_listing
+
+
+# Opcodes of 'special' instructions that must be issued in slot2, as a
+# 64-bit mask indexed by opcode: j, jal, beq, bne, lw, sw
+SPECIAL_MASK = (1 << 2) | (1 << 3) | (1 << 4) | (1 << 5) | (1 << 35) | (1 << 43)
+
+# Register-usage class of each opcode, indexed by the 6-bit opcode field
+OP_I = 0      # reads rs, writes rt (addi, lw, ...; the default)
+OP_R = 1      # R-type, refined by FUNCT_CLASS
+OP_J = 2      # j: no registers
+OP_JAL = 3    # jal: writes $31
+OP_READ2 = 4  # beq, bne, sw: read rs and rt, no write
+OPC_CLASS = bytearray(64)
+OPC_CLASS[0] = OP_R
+OPC_CLASS[2] = OP_J
+OPC_CLASS[3] = OP_JAL
+OPC_CLASS[4] = OPC_CLASS[5] = OPC_CLASS[43] = OP_READ2
+
+# Register-usage class of each R-type funct, indexed by the 6-bit funct field
+FN_ALU = 0    # reads rs and rt, writes rd (the default)
+FN_SHIFT = 1  # sll, srl, sra: read rt, write rd
+FN_JR = 2     # jr: reads rs
+FUNCT_CLASS = bytearray(64)
+FUNCT_CLASS[0] = FUNCT_CLASS[2] = FUNCT_CLASS[3] = FN_SHIFT
+FUNCT_CLASS[8] = FN_JR
 
-def decode_mips(hex_instr):
+# Decoded register usage of one instruction
+Decoded = namedtuple("Decoded", ["reads", "writes", "special"])
+
+def decode_mips(instr):
     """
-    Decode a 32-bit MIPS instruction (as an 8-digit hex string)
-    into its read and write register sets.
-    Returns a dictionary with:
-      - type: "R", "I", "J", or "nop"
-      - opcode: integer opcode value
-      - reads: set of register numbers read
-      - writes: set of register numbers written
+    Decode a 32-bit MIPS instruction word into its read and write
+    register masks. This is the scalar decoder used for small programs and
+    when NumPy is not installed; decode_program and scheduler_ext.c apply
+    the same rules.
+    Returns a Decoded named tuple (reads, writes, special) where:
+      - reads: bitmask of register numbers read (bit r set for register $r)
+      - writes: bitmask of register numbers written
+      - special: True if the instruction must be issued in slot2
 
     For simplicity:
       * R-type (opcode 0):
@@ -37,172 +69,286 @@ def decode_mips(hex_instr):
       * J-type:
           - j (opcode 2) reads nothing.
           - jal (opcode 3) writes to register 31.
-      * NOP is treated as type "nop" with no register usage.
+      * NOP has no register usage.
     """
-    if hex_instr == "00000000":
-        return {"type": "nop", "opcode": 0, "reads": set(), "writes": set()}
-    instr = int(hex_instr, 16)
+    if instr == 0:  # NOP
+        return Decoded(0, 0, False)
     opcode = (instr >> 26) & 0x3F
-    if opcode == 0:  # R-type
-        funct = instr & 0x3F
-        rs = (instr >> 21) & 0x1F
-        rt = (instr >> 16) & 0x1F
-        rd = (instr >> 11) & 0x1F
-        if funct in {0, 2, 3}:  # shift instructions
-            return {"type": "R", "opcode": opcode, "funct": funct, "reads": {rt}, "writes": {rd}}
-        elif funct == 8:  # jr
-            return {"type": "R", "opcode": opcode, "funct": funct, "reads": {rs}, "writes": set()}
-        else:
-            return {"type": "R", "opcode": opcode, "funct": funct, "reads": {rs, rt}, "writes": {rd}}
-    elif opcode in {2, 3}:  # J-type
-        if opcode == 3:  # jal writes to $31
-            return {"type": "J", "opcode": opcode, "reads": set(), "writes": {31}}
-        else:
-            return {"type": "J", "opcode": opcode, "reads": set(), "writes": set()}
-    else:  # I-type
-        rs = (instr >> 21) & 0x1F
-        rt = (instr >> 16) & 0x1F
-        if opcode in {4, 5}:  # branches: beq, bne
-            return {"type": "I", "opcode": opcode, "reads": {rs, rt}, "writes": set()}
-        elif opcode == 35:  # lw
-            return {"type": "I", "opcode": opcode, "reads": {rs}, "writes": {rt}}
-        elif opcode == 43:  # sw
-            return {"type": "I", "opcode": opcode, "reads": {rs, rt}, "writes": set()}
-        else:
-            return {"type": "I", "opcode": opcode, "reads": {rs}, "writes": {rt}}
-
-def can_schedule_in_slot1(candidate_hex, special_hex):
-    """
-    Check if a candidate non-special instruction can safely be scheduled
-    in slot1 with the given special instruction in slot2.
-    The candidate is safe if:
-      - Its write set does not intersect the special's read set.
-      - The special's write set does not intersect the candidate's read set.
-    """
-    cand = decode_mips(candidate_hex)
-    spec = decode_mips(special_hex)
-    if cand['writes'] & spec['reads']:
-        return False
-    if spec['writes'] & cand['reads']:
-        return False
-    return True
-
-def safe_pair(hex1, hex2):
-    """
-    Check if two instructions (given by their hex strings) can be safely
-    issued in the same packet (i.e. no data hazard between them).
-    Returns True if safe, False otherwise.
-    """
-    inst1 = decode_mips(hex1)
-    inst2 = decode_mips(hex2)
-    if inst1['writes'] & inst2['reads']:
-        return False
-    if inst2['writes'] & inst1['reads']:
-        return False
-    return True
-
-def read_instructions(file_path):
-    """
-    Read the assembler's output file and extract a list of instructions.
-    Each line is expected to be in the format:
-       binary: <binary_string>, hex: <hex_string>
-    Returns a list of tuples: (full_line, hex_string)
-    """
-    instructions = []
-    with open(file_path, 'r') as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
-            if "hex:" in line:
-                parts = line.split("hex:")
-                # Extract only the actual hex digits.
-                hex_code = parts[1].strip().split()[0]
-                instructions.append((line, hex_code))
-    return instructions
-
-def schedule_instructions_enhanced(instructions):
+    op_class = OPC_CLASS[opcode]
+    special = bool((SPECIAL_MASK >> opcode) & 1)
+    rs_bit = 1 << ((instr >> 21) & 0x1F)
+    rt_bit = 1 << ((instr >> 16) & 0x1F)
+    if op_class == OP_R:
+        funct_class = FUNCT_CLASS[instr & 0x3F]
+        rd_bit = 1 << ((instr >> 11) & 0x1F)
+        if funct_class == FN_SHIFT:
+            return Decoded(rt_bit, rd_bit, special)
+        elif funct_class == FN_JR:
+            return Decoded(rs_bit, 0, special)
+        return Decoded(rs_bit | rt_bit, rd_bit, special)
+    elif op_class == OP_I:
+        return Decoded(rs_bit, rt_bit, special)
+    elif op_class == OP_READ2:
+        return Decoded(rs_bit | rt_bit, 0, special)
+    elif op_class == OP_JAL:
+        return Decoded(0, 1 << 31, special)
+    return Decoded(0, 0, special)
+
+# Scheduling window: how many following instructions are searched for a
+# partner. Real dual-issue hardware only looks a few instructions ahead,
+# and bounding the search keeps each packet O(1).
+WINDOW = 8
+
+def pack_masks(reads, writes):
+    """
+    Pack an instruction's register masks into the two 64-bit words used by
+    the pairing loop: packed = writes:reads and swapped = reads:writes
+    (high:low 32 bits). For instructions a and b,
+    packed[a] & swapped[b] == (writes_a & reads_b) << 32 | (reads_a & writes_b),
+    so a single AND checks both hazard directions: the pair is safe when
+    neither instruction writes a register the other reads.
+    """
+    return (writes << 32) | reads, (reads << 32) | writes
+
+def _pair_slots(packed, swapped, special, slot1, slot2):
+    """
+    Core pairing loop over pre-decoded instructions.
+    packed/swapped are the register masks combined by pack_masks and special
+    the slot2-only flags, all indexed by instruction. Fills slot1/slot2 with the instruction index for
+    each packet (-1 meaning NOP) and returns the number of packets.
+    Already-scheduled instructions are tracked in 'used', an integer bitset
+    relative to the current index (bit k set means instruction i + k is
+    used). It is shifted right once per instruction, so it never grows past
+    WINDOW + 1 bits. Written with plain indexing and integer ops only, so the
+    same code runs in CPython and under Numba; the hazard test is one AND
+    of packed and swapped masks (see pack_masks).
+    """
+    n = len(packed)
+    count = 0
+    used = 0
+    for i in range(n):
+        if not used & 1:
+            curr = packed[i]
+            end = min(i + 1 + WINDOW, n)
+            candidate_index = -1
+            if special[i]:
+                # For a special instruction, try to find a non-special candidate for slot1.
+                for j in range(i + 1, end):
+                    if not (used >> (j - i)) & 1 and not special[j] and (curr & swapped[j]) == 0:
+                        candidate_index = j
+                        break
+                slot1[count] = candidate_index
+                slot2[count] = i
+            else:
+                # For a non-special instruction, try to find the next unscheduled instruction
+                # that can be safely paired with it.
+                for j in range(i + 1, end):
+                    if not (used >> (j - i)) & 1 and (curr & swapped[j]) == 0:
+                        candidate_index = j
+                        break
+                slot1[count] = i
+                slot2[count] = candidate_index
+            if candidate_index >= 0:
+                used |= 1 << (candidate_index - i)
+            count += 1
+        used >>= 1
+    return count
+
+# Smallest program decoded with NumPy. Importing NumPy costs about 0.06-0.075s,
+# while decode_mips takes about 1.1us per instruction against 0.1us for
+# decode_program (measured: NumPy breaks even around 60k instructions).
+NUMPY_MIN_INSTRUCTIONS = 60_000
+
+@functools.lru_cache(maxsize=None)
+def _numpy():
+    """
+    Import NumPy on first use. NumPy is optional and imported lazily, since
+    the import alone outweighs decoding small programs one by one. Returns
+    the numpy module, or None when NumPy is not installed.
+    """
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+# Smallest program that uses the Numba pairing loop. Importing Numba and
+# loading the cached kernel costs about 0.15-0.2s, while the plain-Python
+# loop takes roughly 0.6-1.5us per instruction (measured: Numba breaks even
+# around 150k instructions on hazard-heavy code and 300k on typical code).
+NUMBA_MIN_INSTRUCTIONS = 200_000
+
+@functools.lru_cache(maxsize=None)
+def _numba_pair_slots():
+    """
+    Compile _pair_slots with Numba on first use. Numba is optional and
+    imported lazily, since the import alone outweighs the pairing loop on
+    small programs. Returns None when Numba is not installed.
+    """
+    try:
+        from numba import njit
+    except ImportError:
+        return None
+    return njit(cache=True)(_pair_slots)
+
+def decode_program(words):
+    """
+    Vectorized counterpart of decode_mips for a whole program.
+    Takes a NumPy uint32 array of instruction words and returns
+    (reads, writes, special) arrays, decoded with the same rules as
+    decode_mips (including the OPC_CLASS/FUNCT_CLASS tables) using array
+    shifts and masks instead of a Python call per instruction.
+    """
+    np = _numpy()
+    one = np.uint32(1)
+    op = (words >> 26) & 0x3F
+    op_class = np.frombuffer(OPC_CLASS, dtype=np.uint8)[op]
+    funct_class = np.frombuffer(FUNCT_CLASS, dtype=np.uint8)[words & 0x3F]
+    rs_bit = one << ((words >> 21) & 0x1F)
+    rt_bit = one << ((words >> 16) & 0x1F)
+    rd_bit = one << ((words >> 11) & 0x1F)
+    zero = np.uint32(0)
+    nop = words == 0
+    r_type = op_class == OP_R
+    shift = r_type & (funct_class == FN_SHIFT)
+    jr = r_type & (funct_class == FN_JR)
+    jump = op_class == OP_J
+    jal = op_class == OP_JAL
+    read2 = op_class == OP_READ2
+    reads = np.select(
+        [nop, shift, jr, r_type, jump | jal, read2],
+        [zero, rt_bit, rs_bit, rs_bit | rt_bit, zero, rs_bit | rt_bit],
+        default=rs_bit)
+    writes = np.select(
+        [nop | jr, r_type, jump, jal, read2],
+        [zero, rd_bit, zero, np.uint32(1 << 31), zero],
+        default=rt_bit)
+    special = ((np.uint64(SPECIAL_MASK) >> op.astype(np.uint64)) & np.uint64(1)).astype(np.bool_)
+    return reads.astype(np.uint32), writes.astype(np.uint32), special
+
+def _schedule_ext(words):
+    """
+    Run the whole schedule in the C extension (scheduler_ext.schedule).
+    Returns (slot1, slot2) index lists with -1 meaning NOP.
+    """
+    words = words if isinstance(words, array) and words.typecode == 'I' else array('I', words)
+    n = len(words)
+    packed = array('Q', bytes(8 * n))
+    swapped = array('Q', bytes(8 * n))
+    special = array('B', bytes(n))
+    slot1 = array('q', bytes(8 * n))
+    slot2 = array('q', bytes(8 * n))
+    count = _ext.schedule(words.buffer_info()[0], n, WINDOW,
+                          packed.buffer_info()[0], swapped.buffer_info()[0], special.buffer_info()[0],
+                          slot1.buffer_info()[0], slot2.buffer_info()[0])
+    return slot1[:count].tolist(), slot2[:count].tolist()
+
+def _pick_backend(n):
+    """
+    Choose the scheduling backend for an n-instruction program: the C
+    extension when built, else Numba for programs of at least
+    NUMBA_MIN_INSTRUCTIONS and NumPy for programs of at least
+    NUMPY_MIN_INSTRUCTIONS when installed, else plain Python.
+    """
+    if _ext is not None:
+        return "c"
+    if n < NUMPY_MIN_INSTRUCTIONS or _numpy() is None:
+        return "python"
+    if n >= NUMBA_MIN_INSTRUCTIONS and _numba_pair_slots() is not None:
+        return "numba"
+    return "numpy"
+
+def _schedule_slots(words, backend=None):
+    """
+    Compute the packet slots for a program with the given backend ("c",
+    "numba", "numpy" or "python"; chosen by _pick_backend when None).
+    "numpy" decodes with decode_program and runs _pair_slots in Python,
+    "numba" runs it compiled, "python" decodes with decode_mips.
+    Returns (slot1, slot2) index lists with -1 meaning NOP.
+    """
+    if backend is None:
+        backend = _pick_backend(len(words))
+    if backend == "c":
+        return _schedule_ext(words)
+
+    n = len(words)
+    if backend == "python":
+        decoded = [decode_mips(word) for word in words]
+        masks = [pack_masks(d.reads, d.writes) for d in decoded]
+        packed = [m[0] for m in masks]
+        swapped = [m[1] for m in masks]
+        special = [d.special for d in decoded]
+    else:
+        np = _numpy()
+        reads, writes, special = decode_program(np.asarray(words, dtype=np.uint32))
+        packed, swapped = pack_masks(reads.astype(np.uint64), writes.astype(np.uint64))
+
+    if backend == "numba":
+        slot1 = np.empty(n, dtype=np.int64)
+        slot2 = np.empty(n, dtype=np.int64)
+        count = _numba_pair_slots()(packed, swapped, special, slot1, slot2)
+        return slot1[:count].tolist(), slot2[:count].tolist()
+
+    if backend == "numpy":
+        packed, swapped, special = packed.tolist(), swapped.tolist(), special.tolist()
+    slot1 = [-1] * n
+    slot2 = [-1] * n
+    count = _pair_slots(packed, swapped, special, slot1, slot2)
+    return slot1[:count], slot2[:count]
+
+def schedule_instructions_enhanced(lines, words):
     """
     Schedule instructions into dual-issue packets with enhanced filling.
+    lines[k] is the listing line shown for instruction k and words[k] its
+    32-bit encoding, as produced by Assembler.assemble_program.
+    Returns a list of (slot1_line, slot2_line) packets.
     The algorithm works as follows:
       - For each unscheduled instruction:
           * If it is special (must be in slot2), scan ahead for an unscheduled,
-            non-special candidate that is hazard-safe (using can_schedule_in_slot1).
+            non-special candidate that is hazard-safe (neither writes a register the other reads).
             If found, schedule that candidate in slot1; otherwise, use a NOP.
           * If it is non-special, scan ahead for an unscheduled candidate that is
-            safe to pair (using safe_pair). If found, schedule them in the same packet.
+            safe to pair (same hazard test). If found, schedule them in the same packet.
             If no safe candidate is available, pair with a NOP.
-    The algorithm preserves program order and uses a 'used' flag array.
-    """
-    n = len(instructions)
-    used = [False] * n
-    packets = []
-    nop_line = "binary: 00000000000000000000000000000000, hex: 00000000"
-    i = 0
-    while i < n:
-        if used[i]:
-            i += 1
-            continue
-
-        curr_line, curr_hex = instructions[i]
-        if is_special(curr_hex):
-            # For a special instruction, try to find a candidate for slot1.
-            candidate_index = None
-            for j in range(i + 1, n):
-                if not used[j]:
-                    cand_line, cand_hex = instructions[j]
-                    if not is_special(cand_hex) and can_schedule_in_slot1(cand_hex, curr_hex):
-                        candidate_index = j
-                        break
-            if candidate_index is not None:
-                packets.append((instructions[candidate_index][0], curr_line))
-                used[candidate_index] = True
-                used[i] = True
-            else:
-                packets.append((nop_line, curr_line))
-                used[i] = True
-            i += 1
-        else:
-            # For a non-special instruction, try to find the next unscheduled instruction
-            # that can be safely paired with it (using safe_pair).
-            candidate_index = None
-            for j in range(i + 1, n):
-                if not used[j]:
-                    cand_line, cand_hex = instructions[j]
-                    if safe_pair(curr_hex, cand_hex):
-                        candidate_index = j
-                        break
-            if candidate_index is not None:
-                packets.append((curr_line, instructions[candidate_index][0]))
-                used[i] = True
-                used[candidate_index] = True
-            else:
-                packets.append((curr_line, nop_line))
-                used[i] = True
-            i += 1
-    return packets
+      - The scan only looks at the next WINDOW instructions, so scheduling is
+        O(N * WINDOW) instead of O(N^2).
+    The work is done by _schedule_slots, which uses the C extension when it
+    has been built, NumPy and Numba for large programs when installed, and
+    plain Python otherwise.
+    The algorithm preserves program order and tracks scheduled instructions
+    in a small 'used' bitset.
+    """
+    slot1, slot2 = _schedule_slots(words)
+    nop_line = "binary: %s, hex: %08X" % (NOP_BINARY, 0)
+    return [(lines[s1] if s1 >= 0 else nop_line,
+             lines[s2] if s2 >= 0 else nop_line)
+            for s1, s2 in zip(slot1, slot2)]
 
 def main():
-    input_file = "output.txt"                 # Input file from the assembler
+    input_file = "input.txt"                  # Assembly source, assembled in memory
+    listing_file = "output.txt"               # Assembler listing (binary + hex)
     output_file = "scheduled_instructions.txt"  # File for the scheduled instructions
 
-    # Read instructions from the assembler's output.
-    instructions = read_instructions(input_file)
-    if not instructions:
+    # Assemble the program once; the listing is written for reference and the
+    # words are handed to the scheduler without a text round trip.
+    with open(input_file, 'r') as f:
+        lines, words = assemble_program(f)
+    write_listing(lines, listing_file)
+    if not words:
         print("No instructions found in", input_file)
         return
 
     # Schedule instructions into dual-issue packets with enhanced scheduling.
-    packets = schedule_instructions_enhanced(instructions)
+    packets = schedule_instructions_enhanced(lines, words)
 
-    # Write the scheduled packets to the separate file.
+    # Write the scheduled packets to the separate file in one call.
+    out_lines = ["Packet %d:\n  Slot1: %s\n  Slot2: %s\n\n" % (idx, slot1, slot2)
+                 for idx, (slot1, slot2) in enumerate(packets, start=1)]
     with open(output_file, 'w') as f:
-        for idx, (slot1, slot2) in enumerate(packets, start=1):
-            f.write(f"Packet {idx}:\n")
-            f.write(f"  Slot1: {slot1}\n")
-            f.write(f"  Slot2: {slot2}\n\n")
+        f.writelines(out_lines)
 
-    print(f"Scheduling complete. Scheduled instructions written to '{output_file}'.")
+    print(f"Scheduling complete. Listing written to '{listing_file}', "
+          f"scheduled instructions to '{output_file}'.")
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,120 @@
+/*
+ * Optional compiled scheduler for scheduler.py, loaded with ctypes.
+ * Same decode rules and pairing loop as decode_mips / _pair_slots.
+ *
+ * Build (Linux/macOS):  cc -O3 -march=native -shared -fPIC -o scheduler_ext.so scheduler_ext.c
+ * Build (Windows/MinGW): gcc -O3 -march=native -shared -o scheduler_ext.dll scheduler_ext.c
+ */
+#include <stdint.h>
+
+#ifdef _WIN32
+#define EXPORT __declspec(dllexport)
+#else
+#define EXPORT
+#endif
+
+/* Decode one word into read/write register masks and the slot2-only flag. */
+static void decode(uint32_t instr, uint32_t *reads, uint32_t *writes, int *special)
+{
+    uint32_t opcode = instr >> 26;
+    uint32_t rs_bit = 1u << ((instr >> 21) & 0x1F);
+    uint32_t rt_bit = 1u << ((instr >> 16) & 0x1F);
+    uint32_t rd_bit = 1u << ((instr >> 11) & 0x1F);
+
+    *reads = 0;
+    *writes = 0;
+    *special = 0;
+    if (instr == 0)  /* NOP */
+        return;
+    switch (opcode) {
+    case 0:  /* R-type */
+        switch (instr & 0x3F) {
+        case 0: case 2: case 3:  /* sll, srl, sra */
+            *reads = rt_bit;
+            *writes = rd_bit;
+            break;
+        case 8:  /* jr */
+            *reads = rs_bit;
+            break;
+        default:
+            *reads = rs_bit | rt_bit;
+            *writes = rd_bit;
+        }
+        break;
+    case 2:  /* j */
+        *special = 1;
+        break;
+    case 3:  /* jal writes $31 */
+        *writes = 1u << 31;
+        *special = 1;
+        break;
+    case 4: case 5: case 43:  /* beq, bne, sw */
+        *reads = rs_bit | rt_bit;
+        *special = 1;
+        break;
+    case 35:  /* lw */
+        *reads = rs_bit;
+        *writes = rt_bit;
+        *special = 1;
+        break;
+    default:  /* other I-type */
+        *reads = rs_bit;
+        *writes = rt_bit;
+    }
+}
+
+/*
+ * Schedule n words into dual-issue packets, searching `window` instructions
+ * ahead (at most 62). Fills slot1/slot2 (each with room for n entries) with
+ * instruction indices, -1 meaning NOP, and returns the number of packets.
+ * The caller provides scratch buffers of n entries for the decoded masks,
+ * packed as writes:reads and swapped as reads:writes (high:low 32 bits), so
+ * packed[a] & swapped[b] covers both hazard directions in one AND.
+ */
+EXPORT long schedule(const uint32_t *words, long n, long window,
+                     uint64_t *packed, uint64_t *swapped, uint8_t *special,
+                     int64_t *slot1, int64_t *slot2)
+{
+    long i, j, end, count = 0;
+    uint64_t used = 0;  /* bit k set: instruction i + k already scheduled */
+
+    for (i = 0; i < n; i++) {
+        uint32_t r, w;
+        int s;
+        decode(words[i], &r, &w, &s);
+        packed[i] = ((uint64_t)w << 32) | r;
+        swapped[i] = ((uint64_t)r << 32) | w;
+        special[i] = (uint8_t)s;
+    }
+
+    for (i = 0; i < n; i++, used >>= 1) {
+        long candidate = -1;
+        uint64_t curr;
+
+        if (used & 1)
+            continue;
+        curr = packed[i];
+        end = i + 1 + window < n ? i + 1 + window : n;
+        for (j = i + 1; j < end; j++) {
+            if ((used >> (j - i)) & 1)
+                continue;
+            if (special[i] && special[j])
+                continue;
+            if ((curr & swapped[j]) == 0) {
+                candidate = j;
+                break;
+            }
+        }
+        if (special[i]) {
+            slot1[count] = candidate;
+            slot2[count] = i;
+        } else {
+            slot1[count] = i;
+            slot2[count] = candidate;
+        }
+        if (candidate >= 0)
+            used |= (uint64_t)1 << (candidate - i);
+        count++;
+    }
+    return count;
+}
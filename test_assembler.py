@@ -0,0 +1,148 @@
+"""
+Golden test for Assembler.assemble_program: a fixed source exercising every
+handler, pseudo-instruction, hex and negative immediate, uppercase mnemonic
+and comment form must assemble to the listing produced by the original
+assembler. Run with `python -m unittest test_assembler` (or pytest).
+"""
+import unittest
+
+from Assembler import assemble_program
+
+SOURCE = """\
+# every handler once, plus hex/negative immediates, uppercase and comments
+start:
+add $1, $2, $3
+SUB $4, $5, $6   # uppercase mnemonic, inline comment
+and $7, $8, $9
+or $10, $11, $12
+xor $13, $14, $15
+nor $16, $17, $18
+slt $19, $20, $21
+sltu $22, $23, $24
+addu $1, $2, $3
+subu $4, $5, $6
+sll $1, $2, 4
+srl $3, $4, 31
+sra $5, $6, 1
+sll $0, $0, 0
+nop
+addi $1, $0, -5
+addiu $2, $1, 0x7FFF
+andi $3, $2, 0xFF
+ori $4, $3, 255
+xori $5, $4, 0x0F0F
+slti $6, $5, -1
+sltiu $7, $6, 10
+
+loop:
+lw $8, -8($29)
+sw $9, 0x10($4)
+beq $1, $2, done
+bne $3, $4, loop
+sgt $1, $2, $3
+move $4, $5
+li $6, -100
+blt $1, $2, loop
+bgt $3, $4, done
+ble $5, $6, loop
+bge $7, $8, done
+j loop
+jal start
+jr $31
+done:
+nop
+"""
+
+# Listing of SOURCE from the original string-based assembler
+EXPECTED_LISTING = """\
+add $1, $2, $3 --> [ binary: 000000_00010_00011_00001_00000_100000, hex: 00430820 ]
+SUB $4, $5, $6 --> [ binary: 000000_00101_00110_00100_00000_100010, hex: 00A62022 ]
+and $7, $8, $9 --> [ binary: 000000_01000_01001_00111_00000_100100, hex: 01093824 ]
+or $10, $11, $12 --> [ binary: 000000_01011_01100_01010_00000_100101, hex: 016C5025 ]
+xor $13, $14, $15 --> [ binary: 000000_01110_01111_01101_00000_100110, hex: 01CF6826 ]
+nor $16, $17, $18 --> [ binary: 000000_10001_10010_10000_00000_100111, hex: 02328027 ]
+slt $19, $20, $21 --> [ binary: 000000_10100_10101_10011_00000_101010, hex: 0295982A ]
+sltu $22, $23, $24 --> [ binary: 000000_10111_11000_10110_00000_101011, hex: 02F8B02B ]
+addu $1, $2, $3 --> [ binary: 000000_00010_00011_00001_00000_100001, hex: 00430821 ]
+subu $4, $5, $6 --> [ binary: 000000_00101_00110_00100_00000_100011, hex: 00A62023 ]
+sll $1, $2, 4 --> [ binary: 000000_00000_00010_00001_00100_000000, hex: 00020900 ]
+srl $3, $4, 31 --> [ binary: 000000_00000_00100_00011_11111_000010, hex: 00041FC2 ]
+sra $5, $6, 1 --> [ binary: 000000_00000_00110_00101_00001_000011, hex: 00062843 ]
+sll $0, $0, 0 --> [ binary: 000000_00000_00000_00000_00000_000000, hex: 00000000 ]
+nop --> [ binary: 00000000000000000000000000000000, hex: 00000000 ]
+addi $1, $0, -5 --> [ binary: 001000_00000_00001_1111111111111011, hex: 2001FFFB ]
+addiu $2, $1, 0x7FFF --> [ binary: 001001_00001_00010_0111111111111111, hex: 24227FFF ]
+andi $3, $2, 0xFF --> [ binary: 001100_00010_00011_0000000011111111, hex: 304300FF ]
+ori $4, $3, 255 --> [ binary: 001101_00011_00100_0000000011111111, hex: 346400FF ]
+xori $5, $4, 0x0F0F --> [ binary: 001110_00100_00101_0000111100001111, hex: 38850F0F ]
+slti $6, $5, -1 --> [ binary: 001010_00101_00110_1111111111111111, hex: 28A6FFFF ]
+sltiu $7, $6, 10 --> [ binary: 001011_00110_00111_0000000000001010, hex: 2CC7000A ]
+lw $8, -8($29) --> [ binary: 100011_11101_01000_1111111111111000, hex: 8FA8FFF8 ]
+sw $9, 0x10($4) --> [ binary: 101011_00100_01001_0000000000010000, hex: AC890010 ]
+beq $1, $2, done --> [ binary: 000100_00001_00010_0000000000010000, hex: 10220010 ]
+bne $3, $4, loop --> [ binary: 000101_00011_00100_1111111111111101, hex: 1464FFFD ]
+sgt $1, $2, $3 --> [ binary: 000000_00011_00010_00001_00000_101010, hex: 0062082A ]
+move $4, $5 --> [ binary: 000000_00101_00000_00100_00000_100000, hex: 00A02020 ]
+li $6, -100 --> [ binary: 001000_00000_00110_1111111110011100, hex: 2006FF9C ]
+blt $1, $2, loop --> [ binary: 000000_00001_00010_11001_00000_101010, hex: 0022C82A ]
+blt $1, $2, loop --> [ binary: 000101_11001_00000_1111111111111000, hex: 1720FFF8 ]
+bgt $3, $4, done --> [ binary: 000000_00100_00011_11001_00000_101010, hex: 0083C82A ]
+bgt $3, $4, done --> [ binary: 000101_11001_00000_0000000000001000, hex: 17200008 ]
+ble $5, $6, loop --> [ binary: 000000_00110_00101_11001_00000_101010, hex: 00C5C82A ]
+ble $5, $6, loop --> [ binary: 000100_11001_00000_1111111111110100, hex: 1320FFF4 ]
+bge $7, $8, done --> [ binary: 000000_00111_01000_11001_00000_101010, hex: 00E8C82A ]
+bge $7, $8, done --> [ binary: 000100_11001_00000_0000000000000100, hex: 13200004 ]
+j loop --> [ binary: 000010_00000000000000000000010110, hex: 08000016 ]
+jal start --> [ binary: 000011_00000000000000000000000000, hex: 0C000000 ]
+jr $31 --> [ binary: 000000_11111_00000_00000_00000_001000, hex: 03E00008 ]
+nop --> [ binary: 00000000000000000000000000000000, hex: 00000000 ]
+"""
+
+def assemble(source):
+    return assemble_program(source.splitlines(keepends=True))
+
+class AssemblerGoldenTest(unittest.TestCase):
+    def test_listing_matches_golden(self):
+        listing, words = assemble(SOURCE)
+        self.assertEqual(listing, EXPECTED_LISTING.splitlines())
+
+    def test_words_match_listing_hex(self):
+        listing, words = assemble(SOURCE)
+        self.assertEqual(len(words), len(listing))
+        for line, word in zip(listing, words):
+            self.assertTrue(line.endswith("hex: %08X ]" % word), line)
+
+    def test_nop_and_zero_shift_differ_only_in_binary_text(self):
+        listing, words = assemble("sll $0, $0, 0\nnop\n")
+        self.assertEqual(list(words), [0, 0])
+        self.assertEqual(listing, [
+            "sll $0, $0, 0 --> [ binary: 000000_00000_00000_00000_00000_000000, hex: 00000000 ]",
+            "nop --> [ binary: 00000000000000000000000000000000, hex: 00000000 ]",
+        ])
+
+class AssemblerErrorTest(unittest.TestCase):
+    def assertAssemblyError(self, source, message):
+        with self.assertRaises(ValueError) as ctx:
+            assemble(source)
+        self.assertEqual(str(ctx.exception), message)
+
+    def test_unknown_branch_label(self):
+        self.assertAssemblyError("L1:\nadd $1, $2, $3\nbeq $1, $2, L3\n",
+                                 "Line 3: unknown label 'L3' in: beq $1, $2, L3")
+
+    def test_unknown_jump_label(self):
+        self.assertAssemblyError("L1:\nj L3  # missing\n",
+                                 "Line 2: unknown label 'L3' in: j L3")
+
+    def test_invalid_memory_operand(self):
+        self.assertAssemblyError("lw $1, 4[$2]\n",
+                                 "Line 1: Invalid memory operand: 4[$2] in: lw $1, 4[$2]")
+        self.assertAssemblyError("sw $1, -0x10($2)\n",
+                                 "Line 1: Invalid memory operand: -0x10($2) in: sw $1, -0x10($2)")
+
+    def test_unknown_mnemonic(self):
+        self.assertAssemblyError("# comment\n\nfrob $1, $2\n",
+                                 "Line 3: unknown instruction 'frob' in: frob $1, $2")
+
+if __name__ == '__main__':
+    unittest.main()